@@ -5,9 +5,15 @@ Provides MCP tools for querying databases via ODBC.
 
 import asyncio
 import argparse
+import importlib
 import sys
 from pathlib import Path
-from .server import ODBCMCPServer
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .server import ODBCMCPServer
+    from .config import ServerConfig, ODBCConnection
+    from .odbc import ODBCHandler
 
 
 def main():
@@ -21,6 +27,7 @@ def main():
     args = parser.parse_args()
     
     try:
+        from .server import ODBCMCPServer
         server = ODBCMCPServer(args.config)
         asyncio.run(server.run())
     except KeyboardInterrupt:
@@ -31,8 +38,22 @@ def main():
         sys.exit(1)
 
 
-# Expose key classes at package level
-from .config import ServerConfig, ODBCConnection
-from .odbc import ODBCHandler
+# Expose key classes at package level. They are imported on first access so
+# that importing the package doesn't load pyodbc, pydantic and mcp up front.
+_LAZY_ATTRS = {
+    'ODBCMCPServer': '.server',
+    'ServerConfig': '.config',
+    'ODBCConnection': '.config',
+    'ODBCHandler': '.odbc',
+}
+
+
+def __getattr__(name):
+    """Import the key classes lazily (PEP 562)."""
+    if name in _LAZY_ATTRS:
+        module = importlib.import_module(_LAZY_ATTRS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-__all__ = ['ODBCMCPServer', 'ServerConfig', 'ODBCConnection', 'ODBCHandler', 'main']
\ No newline at end of file
+__all__ = ['ODBCMCPServer', 'ServerConfig', 'ODBCConnection', 'ODBCHandler', 'main']
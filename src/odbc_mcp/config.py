@@ -8,11 +8,20 @@ import json
 from pathlib import Path
 from typing import Dict, Optional, List, Any
 import configparser
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, validator
+
+try:
+    import orjson
+except ImportError:  # Optional; falls back to the standard library parser
+    orjson = None
 
 
 class ODBCConnection(BaseModel):
     """ODBC connection configuration model."""
+    # Build the validation schema on first use rather than at import, and
+    # make instances immutable so they can be shared without re-validation
+    model_config = ConfigDict(defer_build=True, frozen=True, str_strip_whitespace=True)
+    
     name: str
     connection_string: Optional[str] = None
     dsn: Optional[str] = None
@@ -23,11 +32,13 @@ class ODBCConnection(BaseModel):
     database: Optional[str] = None
     additional_params: Dict[str, str] = Field(default_factory=dict)
     readonly: bool = True  # Enforce read-only mode
+    readonly_check: bool = True  # Also reject write statements before sending them to the driver
+    is_providex: bool = False  # Sage 100 / ProvideX, detected when the config is loaded
     
     @validator('connection_string', 'dsn', 'username', 'password', 'driver', 'server', 'database', pre=True)
     def empty_str_to_none(cls, v):
         """Convert empty strings to None."""
-        if v == "":
+        if isinstance(v, str) and not v.strip():
             return None
         return v
     
@@ -37,35 +48,49 @@ class ODBCConnection(BaseModel):
         if self.connection_string:
             return self.connection_string
         
-        # Otherwise build from components
-        parts = []
+        # Otherwise build from components, skipping any that aren't set
+        pairs = (
+            ("DSN", self.dsn),
+            ("Driver", "{" + self.driver + "}" if self.driver else None),
+            ("Server", self.server),
+            ("Database", self.database),
+            ("UID", self.username),
+            ("PWD", self.password),
+        )
+        parts = [key + "=" + value for key, value in pairs if value]
         
-        if self.dsn:
-            parts.append(f"DSN={self.dsn}")
-        if self.driver:
-            parts.append(f"Driver={{{self.driver}}}")
-        if self.server:
-            parts.append(f"Server={self.server}")
-        if self.database:
-            parts.append(f"Database={self.database}")
-        if self.username:
-            parts.append(f"UID={self.username}")
-        if self.password:
-            parts.append(f"PWD={self.password}")
-            
         # Add any additional parameters
-        for key, value in self.additional_params.items():
-            parts.append(f"{key}={value}")
+        parts.extend(key + "=" + value for key, value in self.additional_params.items())
         
         return ";".join(parts)
 
 
+def _is_providex(name: str, settings: Dict[str, Any]) -> bool:
+    """Detect ProvideX connections by name, driver or connection string."""
+    if name.lower() == "sage100":
+        return True
+    return any(
+        "providex" in (settings.get(key) or "").lower()
+        for key in ('connection_string', 'dsn', 'driver')
+    )
+
+
+def _build_connection(name: str, **settings: Any) -> ODBCConnection:
+    """Create a validated ODBCConnection from config file settings."""
+    settings['is_providex'] = _is_providex(name, settings)
+    return ODBCConnection(name=name, **settings)
+
+
 class ServerConfig(BaseModel):
     """Main server configuration."""
+    model_config = ConfigDict(defer_build=True, frozen=True, str_strip_whitespace=True)
+    
     connections: Dict[str, ODBCConnection] = Field(default_factory=dict)
     default_connection: Optional[str] = None
     max_rows: int = 1000  # Default limit for query results
     timeout: int = 30  # Default timeout in seconds
+    pool_size: int = Field(default=4, ge=1)  # Open connections kept per configured database
+    pool_timeout: int = 30  # Seconds to wait for a free pooled connection
     
     @validator('default_connection')
     def check_default_connection(cls, v, values):
@@ -80,13 +105,17 @@ def load_from_ini(file_path: str) -> ServerConfig:
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Configuration file not found: {file_path}")
     
-    config = configparser.ConfigParser()
-    config.read(file_path)
+    # No interpolation, so values such as connection strings may contain '%'
+    config = configparser.ConfigParser(interpolation=None, empty_lines_in_values=False)
+    with open(file_path, 'r', encoding='utf-8') as f:
+        config.read_string(f.read(), source=file_path)
     
     connections = {}
     default_connection = None
     max_rows = 1000
     timeout = 30
+    pool_size = 4
+    pool_timeout = 30
     
     # Extract server config
     if 'SERVER' in config:
@@ -94,6 +123,8 @@ def load_from_ini(file_path: str) -> ServerConfig:
         default_connection = server_config.get('default_connection')
         max_rows = server_config.getint('max_rows', 1000)
         timeout = server_config.getint('timeout', 30)
+        pool_size = server_config.getint('pool_size', 4)
+        pool_timeout = server_config.getint('pool_timeout', 30)
     
     # Extract connection configs
     for section in config.sections():
@@ -107,13 +138,12 @@ def load_from_ini(file_path: str) -> ServerConfig:
         additional_params = {}
         for key, value in connection_config.items():
             if key not in ['connection_string', 'dsn', 'username', 'password', 
-                          'driver', 'server', 'database', 'readonly']:
+                          'driver', 'server', 'database', 'readonly', 'readonly_check']:
                 additional_params[key] = value
                 
-        # Create the connection object
-        readonly = connection_config.get('readonly', 'true').lower() in ['true', 'yes', '1', 'on']
-        connection = ODBCConnection(
-            name=section,
+        # Create the connection object; the model parses and validates the readonly flags
+        connection = _build_connection(
+            section,
             connection_string=connection_config.get('connection_string'),
             dsn=connection_config.get('dsn'),
             username=connection_config.get('username'),
@@ -122,7 +152,8 @@ def load_from_ini(file_path: str) -> ServerConfig:
             server=connection_config.get('server'),
             database=connection_config.get('database'),
             additional_params=additional_params,
-            readonly=readonly
+            readonly=connection_config.get('readonly', 'true'),
+            readonly_check=connection_config.get('readonly_check', 'true')
         )
         
         connections[section] = connection
@@ -131,7 +162,9 @@ def load_from_ini(file_path: str) -> ServerConfig:
         connections=connections,
         default_connection=default_connection,
         max_rows=max_rows,
-        timeout=timeout
+        timeout=timeout,
+        pool_size=pool_size,
+        pool_timeout=pool_timeout
     )
 
 
@@ -152,8 +185,8 @@ def load_from_claude_config(claude_config_path: Optional[str] = None) -> Optiona
         return None
         
     try:
-        with open(claude_config_path, 'r') as f:
-            claude_config = json.load(f)
+        raw_config = Path(claude_config_path).read_bytes()
+        claude_config = orjson.loads(raw_config) if orjson is not None else json.loads(raw_config)
             
         # Check if our server config exists
         if 'mcpServerEnv' not in claude_config or 'odbc_mcp_server' not in claude_config['mcpServerEnv']:
@@ -164,16 +197,15 @@ def load_from_claude_config(claude_config_path: Optional[str] = None) -> Optiona
         # Process connections
         connections = {}
         for conn_name, conn_config in odbc_config.get('connections', {}).items():
-            connections[conn_name] = ODBCConnection(
-                name=conn_name,
-                **conn_config
-            )
+            connections[conn_name] = _build_connection(conn_name, **conn_config)
             
         return ServerConfig(
             connections=connections,
             default_connection=odbc_config.get('default_connection'),
             max_rows=odbc_config.get('max_rows', 1000),
-            timeout=odbc_config.get('timeout', 30)
+            timeout=odbc_config.get('timeout', 30),
+            pool_size=odbc_config.get('pool_size', 4),
+            pool_timeout=odbc_config.get('pool_timeout', 30)
         )
     except Exception as e:
         print(f"Error loading Claude config: {e}")
@@ -3,12 +3,182 @@ ODBC connection and query management.
 Handles database connections and provides methods for executing queries.
 """
 
+import functools
+import logging
 import pyodbc
+import queue
 import re
-from typing import List, Dict, Any, Optional, Tuple, Union
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Dict, Any, Optional, Tuple, TypeVar, Union
 from .config import ODBCConnection, ServerConfig
 
 
+logger = logging.getLogger("odbc-mcp-server")
+
+T = TypeVar('T')
+
+# Whitespace or a complete comment. Each alternative can only match one way,
+# so skipping a run of them cannot backtrack badly on adversarial input.
+_SQL_GAP = r'(?:\s|--[^\n]*(?:\n|$)|/\*(?:[^*]|\*(?!/))*\*/)'
+
+# Data modification statements, matched after any leading comments. Used by
+# ODBCHandler.is_read_only_query and compiled once at import.
+_WRITE_STMT = re.compile(
+    rf'^{_SQL_GAP}*(INSERT{_SQL_GAP}+INTO|UPDATE|DELETE{_SQL_GAP}+FROM|DROP|CREATE|ALTER|TRUNCATE'
+    rf'|GRANT|REVOKE|MERGE|EXEC|EXECUTE|CALL|SET|USE)\b',
+    re.IGNORECASE
+)
+
+# Statements that already limit their rows or that a pushed-down limit would change.
+# SELECT ... INTO writes its rows instead of returning them, and MySQL needs LIMIT
+# before any locking clause, so neither can take an appended or inserted limit.
+_LIMIT_UNSAFE = re.compile(
+    r'\b(TOP|LIMIT|FETCH|OFFSET|UNION|INTERSECT|EXCEPT|INTO'
+    r'|FOR\s+(UPDATE|SHARE)|LOCK\s+IN\s+SHARE\s+MODE)\b',
+    re.IGNORECASE
+)
+# Leading SELECT keyword, after which SQL Server style TOP is inserted
+_SELECT_HEAD = re.compile(r'^\s*SELECT(\s+(DISTINCT|ALL))?\b', re.IGNORECASE)
+
+# DBMS names (as reported by SQL_DBMS_NAME) that support TOP or LIMIT
+_TOP_DBMS = ('sql server', 'sybase', 'adaptive server')
+_LIMIT_DBMS = ('postgresql', 'mysql', 'mariadb', 'sqlite')
+
+# Largest number of rows pulled from the driver per fetchmany call
+_FETCH_BATCH_SIZE = 500
+
+# Python types pyodbc reports in cursor.description for binary columns
+_BINARY_TYPES = (bytes, bytearray)
+
+# ODBC type codes mapped to display names for get_table_schema
+_ODBC_TYPE_NAMES = {
+    pyodbc.SQL_CHAR: "CHAR",
+    pyodbc.SQL_VARCHAR: "VARCHAR",
+    pyodbc.SQL_LONGVARCHAR: "LONGVARCHAR",
+    pyodbc.SQL_WCHAR: "WCHAR",
+    pyodbc.SQL_WVARCHAR: "WVARCHAR",
+    pyodbc.SQL_WLONGVARCHAR: "WLONGVARCHAR",
+    pyodbc.SQL_DECIMAL: "DECIMAL",
+    pyodbc.SQL_NUMERIC: "NUMERIC",
+    pyodbc.SQL_SMALLINT: "SMALLINT",
+    pyodbc.SQL_INTEGER: "INTEGER",
+    pyodbc.SQL_REAL: "REAL",
+    pyodbc.SQL_FLOAT: "FLOAT",
+    pyodbc.SQL_DOUBLE: "DOUBLE",
+    pyodbc.SQL_BIT: "BIT",
+    pyodbc.SQL_TINYINT: "TINYINT",
+    pyodbc.SQL_BIGINT: "BIGINT",
+    pyodbc.SQL_BINARY: "BINARY",
+    pyodbc.SQL_VARBINARY: "VARBINARY",
+    pyodbc.SQL_LONGVARBINARY: "LONGVARBINARY",
+    pyodbc.SQL_TYPE_DATE: "DATE",
+    pyodbc.SQL_TYPE_TIME: "TIME",
+    pyodbc.SQL_TYPE_TIMESTAMP: "TIMESTAMP",
+    pyodbc.SQL_SS_VARIANT: "SQL_VARIANT",
+    # Not exported by every pyodbc release, so fall back to the SQL Server values
+    getattr(pyodbc, 'SQL_SS_UDT', -151): "UDT",
+    pyodbc.SQL_SS_XML: "XML",
+    pyodbc.SQL_SS_TIME2: "TIME",
+    getattr(pyodbc, 'SQL_SS_TIMESTAMPOFFSET', -155): "TIMESTAMPOFFSET",
+}
+
+# Connection details reported by test_connection, read once per connection
+_CONNECTION_INFO = (
+    ("driver_name", pyodbc.SQL_DRIVER_NAME),
+    ("driver_version", pyodbc.SQL_DRIVER_VER),
+    ("database_name", pyodbc.SQL_DATABASE_NAME),
+    ("dbms_name", pyodbc.SQL_DBMS_NAME),
+    ("dbms_version", pyodbc.SQL_DBMS_VER),
+    ("data_source_read_only", pyodbc.SQL_DATA_SOURCE_READ_ONLY),
+)
+
+# SQL_ATTR_ACCESS_MODE value for read-only connections (not exported by pyodbc)
+_SQL_MODE_READ_ONLY = 1
+
+# How long the system DSN list is reused before pyodbc.dataSources() is called again
+_DSN_CACHE_SECONDS = 60.0
+
+# SQLSTATEs meaning the link to the server is gone and the statement may be retried.
+# Timeouts (HYT00) are left out: the server may still be working, and a retry
+# would only double the wait.
+_CONNECTION_LOST_STATES = frozenset({'08S01', '08003'})
+
+# Pooled connections idle for longer than this are probed before reuse
+_IDLE_PROBE_SECONDS = 60.0
+
+
+def _is_connection_lost(error: Exception) -> bool:
+    """Check whether a pyodbc error reports a dropped connection."""
+    return (
+        isinstance(error, pyodbc.Error)
+        and bool(error.args)
+        and error.args[0] in _CONNECTION_LOST_STATES
+    )
+
+
+def _limit_query(sql: str, dbms_name: str, max_rows: int) -> str:
+    """
+    Push a row limit down to the server for plain SELECT statements.
+    
+    Queries are returned unchanged when the dialect is unknown, the
+    statement already limits its rows or the text holds more than one
+    statement.
+    """
+    head = _SELECT_HEAD.match(sql)
+    if head is None or _LIMIT_UNSAFE.search(sql):
+        return sql
+        
+    # A semicolon before the end may start another statement, which an
+    # appended LIMIT would attach to instead of the SELECT
+    body = sql.rstrip().rstrip(';')
+    if ';' in body:
+        return sql
+        
+    dbms_name = dbms_name.lower()
+    if any(name in dbms_name for name in _TOP_DBMS):
+        return f"{sql[:head.end()]} TOP {max_rows}{sql[head.end():]}"
+    if any(name in dbms_name for name in _LIMIT_DBMS):
+        # Start a new line in case the query ends with a -- comment
+        return f"{body}\nLIMIT {max_rows}"
+    return sql
+
+
+def _binary_to_str(value: Optional[bytes]) -> Optional[str]:
+    """Convert a binary value to a hex string for JSON compatibility."""
+    return None if value is None else value.hex()
+
+
+@functools.lru_cache(maxsize=64)
+def _row_builder(binary_columns: Tuple[bool, ...]) -> Callable[[Any], List[Any]]:
+    """
+    Get a function that copies a result row into a list.
+    
+    The function is generated for the given column layout, converting binary
+    columns by position, so no per-value type checks are needed.
+    """
+    if not any(binary_columns):
+        return list
+        
+    items = ", ".join(
+        f"_binary_to_str(r[{i}])" if binary else f"r[{i}]"
+        for i, binary in enumerate(binary_columns)
+    )
+    return eval(f"lambda r: [{items}]", {"_binary_to_str": _binary_to_str})
+
+
+@functools.lru_cache(maxsize=1)
+def _data_sources(period: int) -> Tuple[Tuple[str, str], ...]:
+    """
+    Read the system DSNs for a cache period.
+    
+    Callers pass the current period number, so the cached list expires once
+    the period changes.
+    """
+    return tuple(pyodbc.dataSources().items())
+
+
 class ODBCHandler:
     """Handles ODBC connections and query execution."""
     
@@ -19,24 +189,51 @@ class ODBCHandler:
         self.default_connection = config.default_connection
         self.max_rows = config.max_rows
         self.timeout = config.timeout
-        self.active_connections: Dict[str, pyodbc.Connection] = {}
+        self.pool_size = config.pool_size
+        self.pool_timeout = config.pool_timeout
+        # Per connection name: idle (connection, last_used) pairs, plus a None
+        # for each slot that has no open connection yet
+        self._pools: Dict[str, queue.LifoQueue] = {}
+        self._conn_meta: Dict[str, Dict[str, Any]] = {}
+        # Cursors kept per pooled connection for liveness probes
+        self._probe_cursors: Dict[pyodbc.Connection, pyodbc.Cursor] = {}
         
     def __del__(self):
         """Ensure all connections are closed on deletion."""
         self.close_all_connections()
         
     def close_all_connections(self):
-        """Close all active database connections."""
-        for conn_name, conn in self.active_connections.items():
+        """Close all idle pooled database connections."""
+        pools, self._pools = self._pools, {}
+        connections = []
+        for pool in pools.values():
+            while True:
+                try:
+                    item = pool.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None:
+                    connections.append(item[0])
+                    
+        # Close connections concurrently so slow disconnects don't add up
+        if len(connections) > 1:
             try:
-                conn.close()
-            except Exception:
+                with ThreadPoolExecutor(max_workers=len(connections)) as executor:
+                    executor.map(self._close, connections)
+                return
+            except RuntimeError:
+                # No new threads during interpreter shutdown; close them one by one
                 pass
-        self.active_connections = {}
-        
+                
+        for connection in connections:
+            self._close(connection)
+                    
     def get_connection(self, connection_name: Optional[str] = None) -> pyodbc.Connection:
         """
-        Get a database connection by name or use the default.
+        Open a new database connection by name or use the default.
+        
+        The caller owns the returned connection; use acquire() to borrow a
+        pooled connection instead.
         
         Args:
             connection_name: Name of the connection to use, or None for default
@@ -48,45 +245,15 @@ class ODBCHandler:
             ValueError: If connection name doesn't exist
             ConnectionError: If connection fails
         """
-        # Use default if not specified
-        if connection_name is None:
-            if self.default_connection is None:
-                if len(self.connections) == 1:
-                    # If only one connection is defined, use it
-                    connection_name = list(self.connections.keys())[0]
-                else:
-                    raise ValueError("No default connection specified and multiple connections exist")
-            else:
-                connection_name = self.default_connection
-                
-        # Check if connection exists
-        if connection_name not in self.connections:
-            raise ValueError(f"Connection '{connection_name}' not found in configuration")
+        connection_name = self._resolve_connection_name(connection_name)
             
-        # Return existing connection if available
-        if connection_name in self.active_connections:
-            try:
-                # Test the connection with a simple query
-                self.active_connections[connection_name].cursor().execute("SELECT 1")
-                return self.active_connections[connection_name]
-            except Exception:
-                # Connection is stale, close it
-                try:
-                    self.active_connections[connection_name].close()
-                except Exception:
-                    pass
-                del self.active_connections[connection_name]
-                
         # Create new connection
         connection_config = self.connections[connection_name]
         conn_str = connection_config.get_connection_string()
         
         try:
-            # Detect if this is ProvideX or has ProvideX in the connection string
-            is_providex = "PROVIDEX" in conn_str.upper() or connection_name.upper() == "SAGE100"
-            
             # Special handling for ProvideX
-            if is_providex:
+            if connection_config.is_providex:
                 # For ProvideX, explicitly set autocommit at connection time
                 connection = pyodbc.connect(conn_str, timeout=self.timeout, autocommit=True)
             else:
@@ -97,12 +264,173 @@ class ODBCHandler:
             connection.setdecoding(pyodbc.SQL_CHAR, encoding='utf-8')
             connection.setdecoding(pyodbc.SQL_WCHAR, encoding='utf-8')
             connection.setencoding(encoding='utf-8')
+            
+            # Ask the driver to enforce read-only access as well. ProvideX is
+            # skipped because it rejects attribute changes after connecting.
+            if connection_config.readonly and not connection_config.is_providex:
+                try:
+                    connection.set_attr(pyodbc.SQL_ATTR_ACCESS_MODE, _SQL_MODE_READ_ONLY)
+                except pyodbc.Error as e:
+                    # Not every driver supports access modes; the SQL check still
+                    # applies unless readonly_check is turned off
+                    logger.warning("Driver rejected read-only access mode for '%s': %s", connection_name, e)
+                    
+            # Driver details don't change between connections, so read them once
+            if connection_name not in self._conn_meta:
+                self._conn_meta[connection_name] = self._read_connection_info(connection)
                 
-            self.active_connections[connection_name] = connection
             return connection
         except Exception as e:
             raise ConnectionError(f"Failed to connect to '{connection_name}': {str(e)}")
             
+    def _read_connection_info(self, connection: pyodbc.Connection) -> Dict[str, Any]:
+        """Read driver and DBMS details from an open connection."""
+        info = {}
+        for key, info_type in _CONNECTION_INFO:
+            try:
+                info[key] = connection.getinfo(info_type)
+            except Exception:
+                info[key] = "Unknown"
+        return info
+        
+    def _resolve_connection_name(self, connection_name: Optional[str] = None) -> str:
+        """
+        Resolve a connection name, falling back to the default connection.
+        
+        Raises:
+            ValueError: If no connection can be chosen or the name doesn't exist
+        """
+        # Use default if not specified
+        if connection_name is None:
+            if self.default_connection is None:
+                if len(self.connections) == 1:
+                    # If only one connection is defined, use it
+                    connection_name = list(self.connections.keys())[0]
+                else:
+                    raise ValueError("No default connection specified and multiple connections exist")
+            else:
+                connection_name = self.default_connection
+                
+        # Check if connection exists
+        if connection_name not in self.connections:
+            raise ValueError(f"Connection '{connection_name}' not found in configuration")
+            
+        return connection_name
+        
+    def _get_pool(self, connection_name: str) -> queue.LifoQueue:
+        """Get the connection pool for a name, creating it on first use."""
+        pool = self._pools.get(connection_name)
+        if pool is None:
+            pool = queue.LifoQueue(maxsize=self.pool_size)
+            for _ in range(self.pool_size):
+                pool.put_nowait(None)
+            # Another thread may have created the pool meanwhile; keep the first one
+            pool = self._pools.setdefault(connection_name, pool)
+        return pool
+        
+    @contextmanager
+    def acquire(self, connection_name: Optional[str] = None) -> Iterator[pyodbc.Connection]:
+        """
+        Borrow a pooled connection for the duration of a with block.
+        
+        Waits up to pool_timeout seconds when every connection is in use.
+        A connection that reported a lost link is closed rather than returned.
+        
+        Args:
+            connection_name: Name of the connection to use, or None for default
+            
+        Raises:
+            ValueError: If connection name doesn't exist
+            ConnectionError: If no connection becomes free in time or connecting fails
+        """
+        connection_name = self._resolve_connection_name(connection_name)
+        pool = self._get_pool(connection_name)
+        try:
+            item = pool.get(timeout=self.pool_timeout)
+        except queue.Empty:
+            raise ConnectionError(f"Timed out waiting for a free connection to '{connection_name}'")
+            
+        connection = None
+        try:
+            if item is not None:
+                connection, last_used = item
+                # Only probe connections that have been idle for a while; failures
+                # on recently used connections are caught and retried by _run
+                if time.monotonic() - last_used >= _IDLE_PROBE_SECONDS and not self._is_alive(connection):
+                    self._close(connection)
+                    connection = None
+            if connection is None:
+                connection = self.get_connection(connection_name)
+        except BaseException:
+            # Hand the slot back so another caller can try to connect
+            pool.put_nowait(None)
+            raise
+            
+        discard = False
+        try:
+            yield connection
+        except Exception as e:
+            discard = _is_connection_lost(e)
+            raise
+        finally:
+            if not discard and not connection.autocommit:
+                # Don't leave an open transaction, or the locks it holds, on an
+                # idle pooled connection; a connection that can't roll back is dropped
+                try:
+                    connection.rollback()
+                except Exception:
+                    discard = True
+            if discard:
+                self._close(connection)
+                pool.put_nowait(None)
+            else:
+                pool.put_nowait((connection, time.monotonic()))
+                
+    def _is_alive(self, connection: pyodbc.Connection) -> bool:
+        """Check an idle connection with a trivial query."""
+        try:
+            # Reuse the connection's probe cursor so the statement isn't re-prepared
+            cursor = self._probe_cursors.get(connection)
+            if cursor is None:
+                cursor = self._probe_cursors[connection] = connection.cursor()
+            cursor.execute("SELECT 1")
+            # Drain the result so the connection isn't left busy
+            cursor.fetchall()
+            return True
+        except Exception:
+            return False
+            
+    def _close(self, connection: pyodbc.Connection):
+        """Close a connection, ignoring errors from connections that are already gone."""
+        cursor = self._probe_cursors.pop(connection, None)
+        try:
+            if cursor is not None:
+                cursor.close()
+            connection.close()
+        except Exception:
+            pass
+            
+    def _run(self, connection_name: Optional[str], operation: Callable[[pyodbc.Connection], T],
+             retry: bool = True) -> T:
+        """
+        Run an operation against a pooled connection.
+        
+        If the server dropped the connection since it was last used, the
+        connection is discarded and, when retry is set, the operation retried
+        once. Pass retry=False for operations that may write, since a lost
+        acknowledgement doesn't mean the statement didn't run.
+        """
+        connection_name = self._resolve_connection_name(connection_name)
+        try:
+            with self.acquire(connection_name) as connection:
+                return operation(connection)
+        except pyodbc.Error as e:
+            if not retry or not _is_connection_lost(e):
+                raise
+                
+        with self.acquire(connection_name) as connection:
+            return operation(connection)
+            
     def list_connections(self) -> List[str]:
         """List all available connection names."""
         return list(self.connections.keys())
@@ -114,13 +442,12 @@ class ODBCHandler:
         Returns:
             List of dictionaries containing DSN information
         """
-        dsns = []
-        for dsn_info in pyodbc.dataSources().items():
-            dsns.append({
-                "name": dsn_info[0],
-                "driver": dsn_info[1]
-            })
-        return dsns
+        period = int(time.monotonic() // _DSN_CACHE_SECONDS)
+        return [{"name": name, "driver": driver} for name, driver in _data_sources(period)]
+        
+    def refresh_dsns(self):
+        """Drop the cached DSN list so the next lookup reads it from the system."""
+        _data_sources.cache_clear()
         
     def list_tables(self, connection_name: Optional[str] = None) -> List[Dict[str, str]]:
         """
@@ -132,38 +459,35 @@ class ODBCHandler:
         Returns:
             List of dictionaries with table information
         """
-        connection = self.get_connection(connection_name)
+        return self._run(connection_name, self._list_tables)
+        
+    def _list_tables(self, connection: pyodbc.Connection) -> List[Dict[str, str]]:
+        """List all tables using an open connection."""
         cursor = connection.cursor()
         
-        tables = []
         try:
-            for table_info in cursor.tables():
-                if table_info.table_type == 'TABLE':
-                    tables.append({
-                        "catalog": table_info.table_cat or "",
-                        "schema": table_info.table_schem or "",
-                        "name": table_info.table_name,
-                        "type": table_info.table_type
-                    })
-            return tables
+            # Let the driver filter on table type; rows are read positionally
+            # (catalog, schema, name, type) as attribute access on Row is slower
+            rows = cursor.tables(tableType='TABLE').fetchall()
         except Exception as e:
+            # Let _run reconnect instead of masking a dropped connection
+            if _is_connection_lost(e):
+                raise
+                
             # For some ODBC drivers that don't support table enumeration,
             # fallback to a SQL query if possible
             try:
-                sql_tables = []
                 cursor.execute("SELECT TABLE_CATALOG, TABLE_SCHEMA, TABLE_NAME, TABLE_TYPE FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_TYPE = 'BASE TABLE'")
-                for row in cursor.fetchall():
-                    sql_tables.append({
-                        "catalog": row[0] or "",
-                        "schema": row[1] or "",
-                        "name": row[2],
-                        "type": row[3]
-                    })
-                return sql_tables
+                rows = cursor.fetchall()
             except Exception:
                 # If everything fails, raise the original error
                 raise ConnectionError(f"Failed to list tables: {str(e)}")
                 
+        return [
+            {"catalog": row[0] or "", "schema": row[1] or "", "name": row[2], "type": row[3]}
+            for row in rows
+        ]
+                
     def get_table_schema(self, table_name: str, connection_name: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Get schema information for a table.
@@ -175,9 +499,6 @@ class ODBCHandler:
         Returns:
             List of dictionaries with column information
         """
-        connection = self.get_connection(connection_name)
-        cursor = connection.cursor()
-        
         # Try to extract schema and table name
         schema_parts = table_name.split('.')
         if len(schema_parts) > 1:
@@ -186,6 +507,16 @@ class ODBCHandler:
         else:
             schema_name = None
             
+        return self._run(
+            connection_name,
+            lambda connection: self._get_table_schema(connection, table_name, schema_name)
+        )
+        
+    def _get_table_schema(self, connection: pyodbc.Connection, table_name: str,
+                          schema_name: Optional[str]) -> List[Dict[str, Any]]:
+        """Get schema information for a table using an open connection."""
+        cursor = connection.cursor()
+        
         columns = []
         try:
             # Use metadata API if available
@@ -205,7 +536,11 @@ class ODBCHandler:
                 
             # Otherwise, try SQL approach
             raise Exception("No columns found")
-        except Exception:
+        except Exception as e:
+            # Let _run reconnect instead of masking a dropped connection
+            if _is_connection_lost(e):
+                raise
+                
             # Try SQL approach for drivers that don't support metadata
             try:
                 sql = f"SELECT * FROM {table_name} WHERE 1=0"
@@ -226,36 +561,7 @@ class ODBCHandler:
                 
     def _get_type_name(self, type_code: int) -> str:
         """Convert ODBC type code to type name."""
-        type_map = {
-            pyodbc.SQL_CHAR: "CHAR",
-            pyodbc.SQL_VARCHAR: "VARCHAR",
-            pyodbc.SQL_LONGVARCHAR: "LONGVARCHAR",
-            pyodbc.SQL_WCHAR: "WCHAR",
-            pyodbc.SQL_WVARCHAR: "WVARCHAR",
-            pyodbc.SQL_WLONGVARCHAR: "WLONGVARCHAR",
-            pyodbc.SQL_DECIMAL: "DECIMAL",
-            pyodbc.SQL_NUMERIC: "NUMERIC",
-            pyodbc.SQL_SMALLINT: "SMALLINT",
-            pyodbc.SQL_INTEGER: "INTEGER",
-            pyodbc.SQL_REAL: "REAL",
-            pyodbc.SQL_FLOAT: "FLOAT",
-            pyodbc.SQL_DOUBLE: "DOUBLE",
-            pyodbc.SQL_BIT: "BIT",
-            pyodbc.SQL_TINYINT: "TINYINT",
-            pyodbc.SQL_BIGINT: "BIGINT",
-            pyodbc.SQL_BINARY: "BINARY",
-            pyodbc.SQL_VARBINARY: "VARBINARY",
-            pyodbc.SQL_LONGVARBINARY: "LONGVARBINARY",
-            pyodbc.SQL_TYPE_DATE: "DATE",
-            pyodbc.SQL_TYPE_TIME: "TIME",
-            pyodbc.SQL_TYPE_TIMESTAMP: "TIMESTAMP",
-            pyodbc.SQL_SS_VARIANT: "SQL_VARIANT",
-            pyodbc.SQL_SS_UDT: "UDT",
-            pyodbc.SQL_SS_XML: "XML",
-            pyodbc.SQL_SS_TIME2: "TIME",
-            pyodbc.SQL_SS_TIMESTAMPOFFSET: "TIMESTAMPOFFSET",
-        }
-        return type_map.get(type_code, f"UNKNOWN({type_code})")
+        return _ODBC_TYPE_NAMES.get(type_code, f"UNKNOWN({type_code})")
         
     def is_read_only_query(self, sql: str) -> bool:
         """
@@ -267,36 +573,9 @@ class ODBCHandler:
         Returns:
             bool: True if the query is read-only, False otherwise
         """
-        # Remove comments and normalize whitespace
-        sql = re.sub(r'--.*?(\n|$)', ' ', sql)
-        sql = re.sub(r'/\*.*?\*/', ' ', sql, flags=re.DOTALL)
-        sql = ' '.join(sql.split()).strip().upper()
-        
-        # Check for data modification statements
-        data_modification_patterns = [
-            r'^\s*INSERT\s+INTO',
-            r'^\s*UPDATE\s+',
-            r'^\s*DELETE\s+FROM',
-            r'^\s*DROP\s+',
-            r'^\s*CREATE\s+',
-            r'^\s*ALTER\s+',
-            r'^\s*TRUNCATE\s+',
-            r'^\s*GRANT\s+',
-            r'^\s*REVOKE\s+',
-            r'^\s*MERGE\s+',
-            r'^\s*EXEC\s+',
-            r'^\s*EXECUTE\s+',
-            r'^\s*CALL\s+',
-            r'^\s*SET\s+',
-            r'^\s*USE\s+',
-        ]
-        
-        for pattern in data_modification_patterns:
-            if re.search(pattern, sql):
-                return False
-                
-        # If no modification patterns are found, it's likely read-only
-        return True
+        # Only the first statement keyword matters, so comments are skipped by
+        # the pattern itself instead of being stripped from a copy of the query
+        return _WRITE_STMT.match(sql) is None
         
     def execute_query(self, sql: str, connection_name: Optional[str] = None, 
                      max_rows: Optional[int] = None) -> Tuple[List[str], List[List[Any]]]:
@@ -311,44 +590,126 @@ class ODBCHandler:
         Returns:
             Tuple of column names and result rows
         """
+        connection_name, max_rows = self._prepare_query(sql, connection_name, max_rows)
+        return self._run(
+            connection_name,
+            lambda connection: self._execute_query(connection, connection_name, sql, max_rows),
+            # Never run a write twice
+            retry=self.is_read_only_query(sql)
+        )
+        
+    def iter_query(self, sql: str, connection_name: Optional[str] = None,
+                   max_rows: Optional[int] = None) -> Iterator[List[Any]]:
+        """
+        Execute an SQL query and yield results as they are fetched.
+        
+        The first item is the cursor description, with one DB-API 7-tuple per
+        column, or empty for statements without a result set. Each following
+        item is a batch of result rows. The pooled connection stays borrowed
+        until the generator is exhausted or closed.
+        
+        Args:
+            sql: SQL query to execute
+            connection_name: Name of the connection to use, or None for default
+            max_rows: Maximum number of rows to return, or None for default
+        """
+        connection_name, max_rows = self._prepare_query(sql, connection_name, max_rows)
+        
+        started = False
+        try:
+            with self.acquire(connection_name) as connection:
+                batches = self._iter_query(connection, connection_name, sql, max_rows)
+                try:
+                    for item in batches:
+                        started = True
+                        yield item
+                finally:
+                    # Release the cursor before the connection goes back to the pool
+                    batches.close()
+            return
+        except pyodbc.Error as e:
+            # Like _run, retry once on a dropped connection, but only for
+            # statements that don't write and while nothing has been handed
+            # to the caller yet
+            if started or not _is_connection_lost(e) or not self.is_read_only_query(sql):
+                raise
+                
+        with self.acquire(connection_name) as connection:
+            yield from self._iter_query(connection, connection_name, sql, max_rows)
+            
+    def _prepare_query(self, sql: str, connection_name: Optional[str],
+                       max_rows: Optional[int]) -> Tuple[str, int]:
+        """
+        Resolve the connection and row limit for a query.
+        
+        Raises:
+            ValueError: If the query writes to a read-only connection
+        """
         # Check if query is read-only for connections with readonly flag
-        connection = self.get_connection(connection_name)
-        connection_config = self.connections[connection_name or self.default_connection]
+        connection_name = self._resolve_connection_name(connection_name)
+        connection_config = self.connections[connection_name]
         
-        if connection_config.readonly and not self.is_read_only_query(sql):
+        # The SQL check can be turned off per connection with readonly_check
+        check_sql = connection_config.readonly and connection_config.readonly_check
+        if check_sql and not self.is_read_only_query(sql):
             raise ValueError("Write operations are not allowed on read-only connections")
             
         # Set max rows limit
         if max_rows is None:
             max_rows = self.max_rows
             
-        # Execute the query
-        cursor = connection.cursor()
-        cursor.execute(sql)
+        return connection_name, max_rows
         
-        # Get column names
-        column_names = [column[0] for column in cursor.description] if cursor.description else []
+    def _execute_query(self, connection: pyodbc.Connection, connection_name: str, sql: str,
+                       max_rows: int) -> Tuple[List[str], List[List[Any]]]:
+        """Execute an SQL query using an open connection."""
+        batches = self._iter_query(connection, connection_name, sql, max_rows)
+        column_names = [column[0] for column in next(batches)]
         
-        # Fetch results with row limit
         results = []
-        row_count = 0
-        
-        for row in cursor:
-            formatted_row = []
-            for value in row:
-                # Convert specific ODBC types to strings for JSON compatibility
-                if isinstance(value, (bytearray, bytes)):
-                    formatted_row.append(str(value))
-                else:
-                    formatted_row.append(value)
-            results.append(formatted_row)
-            
-            row_count += 1
-            if row_count >= max_rows:
-                break
-                
+        for rows in batches:
+            results.extend(rows)
         return column_names, results
         
+    def _iter_query(self, connection: pyodbc.Connection, connection_name: str, sql: str,
+                    max_rows: int) -> Iterator[List[Any]]:
+        """Execute an SQL query using an open connection and yield fetched batches."""
+        # Let the server stop producing rows past the limit where possible
+        dbms_name = self._conn_meta.get(connection_name, {}).get("dbms_name") or ""
+        sql = _limit_query(sql, dbms_name, max_rows)
+        
+        cursor = connection.cursor()
+        try:
+            # Execute the query
+            cursor.arraysize = max(1, min(max_rows, _FETCH_BATCH_SIZE))
+            cursor.execute(sql)
+            
+            # Statements without a result set have nothing to fetch
+            if not cursor.description:
+                yield []
+                return
+                
+            yield list(cursor.description)
+            
+            # Use a row builder specialized for this column layout
+            build_row = _row_builder(tuple(column[1] in _BINARY_TYPES for column in cursor.description))
+            
+            # When the driver reports a row count within the limit, read it in one
+            # call. Drivers may report any count after a SELECT (some say 0), so
+            # every fetch is still capped at the rows left under the limit.
+            batch_size = max_rows if 0 <= cursor.rowcount <= max_rows else cursor.arraysize
+            
+            # Fetch batches until the row limit is reached, never reading past it
+            remaining = max_rows
+            while remaining > 0:
+                rows = cursor.fetchmany(min(remaining, batch_size))
+                if not rows:
+                    break
+                remaining -= len(rows)
+                yield list(map(build_row, rows))
+        finally:
+            cursor.close()
+            
     def test_connection(self, connection_name: Optional[str] = None) -> Dict[str, Any]:
         """
         Test a database connection and return information.
@@ -360,30 +721,12 @@ class ODBCHandler:
             Dictionary with connection status and info
         """
         try:
-            # Get connection
-            conn = self.get_connection(connection_name)
-            cursor = conn.cursor()
-            
             # Get database info
-            database_info = {}
-            
-            try:
-                cursor.execute("SELECT @@version")
-                version = cursor.fetchone()
-                if version:
-                    database_info["version"] = version[0]
-            except Exception:
-                # Some databases don't support @@version
-                pass
+            name = self._resolve_connection_name(connection_name)
+            database_info = self._run(name, self._read_database_info)
                 
-            # Get connection info
-            conn_info = {
-                "driver_name": conn.getinfo(pyodbc.SQL_DRIVER_NAME) if hasattr(conn, 'getinfo') else "Unknown",
-                "driver_version": conn.getinfo(pyodbc.SQL_DRIVER_VER) if hasattr(conn, 'getinfo') else "Unknown",
-                "database_name": conn.getinfo(pyodbc.SQL_DATABASE_NAME) if hasattr(conn, 'getinfo') else "Unknown",
-                "dbms_name": conn.getinfo(pyodbc.SQL_DBMS_NAME) if hasattr(conn, 'getinfo') else "Unknown",
-                "dbms_version": conn.getinfo(pyodbc.SQL_DBMS_VER) if hasattr(conn, 'getinfo') else "Unknown",
-            }
+            # Connection info is cached when the connection is opened
+            conn_info = dict(self._conn_meta[name])
             
             return {
                 "status": "connected",
@@ -397,4 +740,22 @@ class ODBCHandler:
                 "status": "error",
                 "connection_name": connection_name or self.default_connection,
                 "error": str(e)
-            }
\ No newline at end of file
+            }
+            
+    def _read_database_info(self, connection: pyodbc.Connection) -> Dict[str, Any]:
+        """Read the server version using an open connection."""
+        database_info = {}
+        cursor = connection.cursor()
+        
+        try:
+            cursor.execute("SELECT @@version")
+            version = cursor.fetchone()
+            if version:
+                database_info["version"] = version[0]
+        except Exception as e:
+            # Some databases don't support @@version, but let _run reconnect
+            # instead of masking a dropped connection
+            if _is_connection_lost(e):
+                raise
+                
+        return database_info
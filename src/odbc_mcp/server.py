@@ -4,20 +4,29 @@ Provides tools for database querying via the Model Context Protocol.
 """
 
 import asyncio
+import functools
 import os
 import sys
 import json
 import logging
-from typing import Dict, List, Any, Optional
+from contextlib import closing
+from datetime import date, time
+from typing import Callable, Dict, List, Any, Optional, Tuple
 
 from mcp.server import Server, NotificationOptions
 from mcp.server.models import InitializationOptions
 from mcp.server.stdio import stdio_server
 import mcp.types as types
+from mcp.types import TextContent
 
 from .config import load_config, ServerConfig
 from .odbc import ODBCHandler
 
+try:
+    import orjson
+except ImportError:  # Optional; falls back to the standard library encoder
+    orjson = None
+
 
 # Configure logging
 logging.basicConfig(
@@ -30,6 +39,179 @@ logging.basicConfig(
 
 logger = logging.getLogger("odbc-mcp-server")
 
+# Tool input schemas. Each tool gets its own nested dicts so no schema object
+# is shared between tools; _TOOLS already builds them only once.
+_LIST_CONNECTIONS_INPUT = {
+    "type": "object",
+    "properties": {},
+    "required": []
+}
+_LIST_AVAILABLE_DSNS_INPUT = {
+    "type": "object",
+    "properties": {},
+    "required": []
+}
+_TEST_CONNECTION_INPUT = {
+    "type": "object",
+    "properties": {
+        "connection_name": {
+            "type": "string",
+            "description": "Name of the connection to test (optional, uses default if not specified)"
+        }
+    },
+    "required": []
+}
+_LIST_TABLES_INPUT = {
+    "type": "object",
+    "properties": {
+        "connection_name": {
+            "type": "string",
+            "description": "Name of the connection to use (optional, uses default if not specified)"
+        },
+        "response_format": {
+            "type": "string",
+            "enum": ["markdown", "json"],
+            "description": "Format of the result (optional, defaults to markdown)"
+        }
+    },
+    "required": []
+}
+_GET_TABLE_SCHEMA_INPUT = {
+    "type": "object",
+    "properties": {
+        "table_name": {
+            "type": "string",
+            "description": "Name of the table to describe (required)"
+        },
+        "connection_name": {
+            "type": "string",
+            "description": "Name of the connection to use (optional, uses default if not specified)"
+        },
+        "response_format": {
+            "type": "string",
+            "enum": ["markdown", "json"],
+            "description": "Format of the result (optional, defaults to markdown)"
+        }
+    },
+    "required": ["table_name"]
+}
+_EXECUTE_QUERY_INPUT = {
+    "type": "object",
+    "properties": {
+        "sql": {
+            "type": "string",
+            "description": "SQL query to execute (required)"
+        },
+        "connection_name": {
+            "type": "string",
+            "description": "Name of the connection to use (optional, uses default if not specified)"
+        },
+        "max_rows": {
+            "type": "integer",
+            "description": "Maximum number of rows to return (optional, uses default if not specified)"
+        },
+        "response_format": {
+            "type": "string",
+            "enum": ["markdown", "json"],
+            "description": "Format of the result (optional, defaults to markdown)"
+        }
+    },
+    "required": ["sql"]
+}
+
+# Tool definitions advertised to MCP clients; built once at import time
+_TOOLS = [
+    types.Tool(
+        name="list-connections",
+        description="List all configured database connections",
+        inputSchema=_LIST_CONNECTIONS_INPUT
+    ),
+    types.Tool(
+        name="list-available-dsns",
+        description="List all available DSNs on the system",
+        inputSchema=_LIST_AVAILABLE_DSNS_INPUT
+    ),
+    types.Tool(
+        name="test-connection",
+        description="Test a database connection and return information",
+        inputSchema=_TEST_CONNECTION_INPUT
+    ),
+    types.Tool(
+        name="list-tables",
+        description="List all tables in the database",
+        inputSchema=_LIST_TABLES_INPUT
+    ),
+    types.Tool(
+        name="get-table-schema",
+        description="Get schema information for a table",
+        inputSchema=_GET_TABLE_SCHEMA_INPUT
+    ),
+    types.Tool(
+        name="execute-query",
+        description="Execute an SQL query and return results",
+        inputSchema=_EXECUTE_QUERY_INPUT
+    )
+]
+
+
+def _text(text: str) -> TextContent:
+    """Wrap a string as a text content block."""
+    return TextContent(type="text", text=text)
+
+
+@functools.lru_cache(maxsize=64)
+def _separator(column_count: int) -> str:
+    """Get the markdown separator line for a table with the given column count."""
+    return "| " + " | ".join(["---"] * column_count) + " |\n"
+
+
+@functools.lru_cache(maxsize=64)
+def _row_formatter(not_null: Tuple[bool, ...]) -> Callable[[Any], str]:
+    """
+    Get a function that renders a result row as a markdown table line.
+    
+    The function is generated for the given column layout, formatting every
+    cell in a single f-string instead of joining a generator per row. NULLs
+    are checked inline, and not at all for columns the driver reports as
+    NOT NULL, while str is bound as a default argument so each cell costs
+    one builtin call rather than a Python-level helper call.
+    """
+    cells = " | ".join(
+        f"{{_str(r[{i}])}}" if not_null[i] else f"{{'NULL' if r[{i}] is None else _str(r[{i}])}}"
+        for i in range(len(not_null))
+    )
+    return eval(f'lambda r, _str=str: f"| {cells} |\\n"', {})
+
+
+def _json_default(value: Any) -> str:
+    """
+    Convert a value JSON has no type for.
+    
+    Dates and times use ISO format as orjson does natively, so the output
+    doesn't depend on whether orjson is installed; anything else, such as
+    Decimal, is written as a string.
+    """
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    return str(value)
+
+
+def _dumps(obj: Any) -> str:
+    """Serialize a tool result as indented JSON."""
+    if orjson is not None:
+        # TextContent only holds str and the MCP transport re-serializes the whole
+        # response message, so the bytes from orjson have to be decoded here
+        return orjson.dumps(obj, default=_json_default, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, indent=2, default=_json_default, ensure_ascii=False)
+
+
+def _wants_json(arguments: Dict[str, Any]) -> bool:
+    """Check whether a tool call asked for a JSON result instead of markdown."""
+    response_format = arguments.get("response_format") or "markdown"
+    if response_format not in ("markdown", "json"):
+        raise ValueError(f"Unsupported response format: {response_format}")
+    return response_format == "json"
+
 
 class ODBCMCPServer:
     """
@@ -43,12 +225,22 @@ class ODBCMCPServer:
             self.odbc = ODBCHandler(self.config)
             self.server = Server("odbc-mcp-server")
             
+            # Map tool names to their handlers
+            self._dispatch = {
+                "list-connections": self._handle_list_connections,
+                "list-available-dsns": self._handle_list_available_dsns,
+                "test-connection": self._handle_test_connection,
+                "list-tables": self._handle_list_tables,
+                "get-table-schema": self._handle_get_table_schema,
+                "execute-query": self._handle_execute_query,
+            }
+            
             # Register tool handlers
             self._register_tools()
             
-            logger.info(f"Initialized ODBC MCP Server with {len(self.config.connections)} connections")
+            logger.info("Initialized ODBC MCP Server with %d connections", len(self.config.connections))
         except Exception as e:
-            logger.error(f"Failed to initialize server: {e}")
+            logger.error("Failed to initialize server: %s", e)
             raise
             
     def _register_tools(self):
@@ -56,192 +248,155 @@ class ODBCMCPServer:
         @self.server.list_tools()
         async def list_tools() -> List[types.Tool]:
             """List available tools for the MCP client."""
-            return [
-                types.Tool(
-                    name="list-connections",
-                    description="List all configured database connections",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {},
-                        "required": []
-                    }
-                ),
-                types.Tool(
-                    name="list-available-dsns",
-                    description="List all available DSNs on the system",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {},
-                        "required": []
-                    }
-                ),
-                types.Tool(
-                    name="test-connection",
-                    description="Test a database connection and return information",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "connection_name": {
-                                "type": "string",
-                                "description": "Name of the connection to test (optional, uses default if not specified)"
-                            }
-                        },
-                        "required": []
-                    }
-                ),
-                types.Tool(
-                    name="list-tables",
-                    description="List all tables in the database",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "connection_name": {
-                                "type": "string",
-                                "description": "Name of the connection to use (optional, uses default if not specified)"
-                            }
-                        },
-                        "required": []
-                    }
-                ),
-                types.Tool(
-                    name="get-table-schema",
-                    description="Get schema information for a table",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "table_name": {
-                                "type": "string",
-                                "description": "Name of the table to describe (required)"
-                            },
-                            "connection_name": {
-                                "type": "string",
-                                "description": "Name of the connection to use (optional, uses default if not specified)"
-                            }
-                        },
-                        "required": ["table_name"]
-                    }
-                ),
-                types.Tool(
-                    name="execute-query",
-                    description="Execute an SQL query and return results",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "sql": {
-                                "type": "string",
-                                "description": "SQL query to execute (required)"
-                            },
-                            "connection_name": {
-                                "type": "string",
-                                "description": "Name of the connection to use (optional, uses default if not specified)"
-                            },
-                            "max_rows": {
-                                "type": "integer",
-                                "description": "Maximum number of rows to return (optional, uses default if not specified)"
-                            }
-                        },
-                        "required": ["sql"]
-                    }
-                )
-            ]
+            return _TOOLS
             
         @self.server.call_tool()
-        async def call_tool(name: str, arguments: Dict[str, Any]) -> List[types.TextContent]:
+        async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
             """Handle tool execution requests."""
             arguments = arguments or {}
             
             try:
-                if name == "list-connections":
-                    connections = self.odbc.list_connections()
-                    result = {
-                        "connections": connections,
-                        "default_connection": self.config.default_connection
-                    }
-                    return [types.TextContent(type="text", text=json.dumps(result, indent=2))]
-                    
-                elif name == "list-available-dsns":
-                    dsns = self.odbc.get_available_dsns()
-                    return [types.TextContent(type="text", text=json.dumps(dsns, indent=2))]
-                    
-                elif name == "test-connection":
-                    connection_name = arguments.get("connection_name")
-                    result = self.odbc.test_connection(connection_name)
-                    return [types.TextContent(type="text", text=json.dumps(result, indent=2))]
-                    
-                elif name == "list-tables":
-                    connection_name = arguments.get("connection_name")
-                    tables = self.odbc.list_tables(connection_name)
-                    
-                    # Format the results for better readability
-                    result_text = "### Tables:\n\n"
-                    for table in tables:
-                        schema_prefix = f"{table['schema']}." if table['schema'] else ""
-                        result_text += f"- {schema_prefix}{table['name']}\n"
-                        
-                    return [types.TextContent(type="text", text=result_text)]
-                    
-                elif name == "get-table-schema":
-                    table_name = arguments.get("table_name")
-                    if not table_name:
-                        raise ValueError("Table name is required")
-                        
-                    connection_name = arguments.get("connection_name")
-                    columns = self.odbc.get_table_schema(table_name, connection_name)
-                    
-                    # Format the results for better readability
-                    result_text = f"### Schema for table {table_name}:\n\n"
-                    result_text += "| Column | Type | Size | Nullable |\n"
-                    result_text += "| ------ | ---- | ---- | -------- |\n"
-                    
-                    for column in columns:
-                        result_text += f"| {column['name']} | {column['type']} | {column['size']} | {'Yes' if column['nullable'] else 'No'} |\n"
-                        
-                    return [types.TextContent(type="text", text=result_text)]
-                    
-                elif name == "execute-query":
-                    sql = arguments.get("sql")
-                    if not sql:
-                        raise ValueError("SQL query is required")
-                        
-                    connection_name = arguments.get("connection_name")
-                    max_rows = arguments.get("max_rows")
-                    
-                    column_names, rows = self.odbc.execute_query(sql, connection_name, max_rows)
-                    
-                    # Format the results as a markdown table
-                    if not column_names:
-                        return [types.TextContent(type="text", text="Query executed successfully, but no results were returned.")]
-                        
-                    # Create the results table
-                    result_text = "### Query Results:\n\n"
-                    
-                    # Add the header row
-                    result_text += "| " + " | ".join(column_names) + " |\n"
-                    
-                    # Add the separator row
-                    result_text += "| " + " | ".join(["---"] * len(column_names)) + " |\n"
-                    
-                    # Add the data rows
-                    for row in rows:
-                        result_text += "| " + " | ".join(str(value) if value is not None else "NULL" for value in row) + " |\n"
-                        
-                    # Add the row count
-                    result_text += f"\n\n_Returned {len(rows)} rows_"
-                    
-                    # Check if we hit the row limit
-                    if max_rows and len(rows) >= max_rows:
-                        result_text += f" _(limited to {max_rows} rows)_"
-                        
-                    return [types.TextContent(type="text", text=result_text)]
-                    
-                else:
+                handler = self._dispatch.get(name)
+                if handler is None:
                     raise ValueError(f"Unknown tool: {name}")
                     
+                return await handler(arguments)
+                    
             except Exception as e:
-                logger.error(f"Error executing tool {name}: {e}")
+                logger.error("Error executing tool %s: %s", name, e)
                 error_message = f"Error executing {name}: {str(e)}"
-                return [types.TextContent(type="text", text=error_message)]
+                return [_text(error_message)]
+                
+    async def _handle_list_connections(self, arguments: Dict[str, Any]) -> List[TextContent]:
+        """List the configured connections and the default connection."""
+        connections = self.odbc.list_connections()
+        result = {
+            "connections": connections,
+            "default_connection": self.config.default_connection
+        }
+        return [_text(_dumps(result))]
+        
+    async def _handle_list_available_dsns(self, arguments: Dict[str, Any]) -> List[TextContent]:
+        """List the DSNs available on the system."""
+        dsns = await asyncio.to_thread(self.odbc.get_available_dsns)
+        return [_text(_dumps(dsns))]
+        
+    async def _handle_test_connection(self, arguments: Dict[str, Any]) -> List[TextContent]:
+        """Test a connection and report its driver and database details."""
+        connection_name = arguments.get("connection_name")
+        result = await asyncio.to_thread(self.odbc.test_connection, connection_name)
+        return [_text(_dumps(result))]
+        
+    async def _handle_list_tables(self, arguments: Dict[str, Any]) -> List[TextContent]:
+        """List the tables of a connection as a markdown list or JSON."""
+        connection_name = arguments.get("connection_name")
+        as_json = _wants_json(arguments)
+        tables = await asyncio.to_thread(self.odbc.list_tables, connection_name)
+        
+        if as_json:
+            return [_text(_dumps(tables))]
+            
+        # Format the results for better readability
+        parts = ["### Tables:\n\n"]
+        for table in tables:
+            schema_prefix = f"{table['schema']}." if table['schema'] else ""
+            parts.append(f"- {schema_prefix}{table['name']}\n")
+        result_text = "".join(parts)
+        
+        return [_text(result_text)]
+        
+    async def _handle_get_table_schema(self, arguments: Dict[str, Any]) -> List[TextContent]:
+        """Describe the columns of a table as a markdown table or JSON."""
+        table_name = arguments.get("table_name")
+        if not table_name:
+            raise ValueError("Table name is required")
+            
+        connection_name = arguments.get("connection_name")
+        as_json = _wants_json(arguments)
+        columns = await asyncio.to_thread(self.odbc.get_table_schema, table_name, connection_name)
+        
+        if as_json:
+            return [_text(_dumps(columns))]
+            
+        # Format the results for better readability
+        parts = [
+            f"### Schema for table {table_name}:\n\n",
+            "| Column | Type | Size | Nullable |\n",
+            "| ------ | ---- | ---- | -------- |\n",
+        ]
+        
+        for column in columns:
+            parts.append(f"| {column['name']} | {column['type']} | {column['size']} | {'Yes' if column['nullable'] else 'No'} |\n")
+        result_text = "".join(parts)
+        
+        return [_text(result_text)]
+        
+    async def _handle_execute_query(self, arguments: Dict[str, Any]) -> List[TextContent]:
+        """Execute a SQL query and return the rows as a markdown table or JSON."""
+        sql = arguments.get("sql")
+        if not sql:
+            raise ValueError("SQL query is required")
+            
+        connection_name = arguments.get("connection_name")
+        # Resolve the default here so the truncation notes match the limit applied
+        max_rows = arguments.get("max_rows") or self.config.max_rows
+        
+        # Return the raw columns and rows, skipping markdown formatting
+        if _wants_json(arguments):
+            column_names, rows = await asyncio.to_thread(self.odbc.execute_query, sql, connection_name, max_rows)
+            return [_text(_dumps({
+                "columns": column_names,
+                "rows": rows,
+                "truncated": len(rows) >= max_rows
+            }))]
+            
+        return await asyncio.to_thread(self._query_markdown, sql, connection_name, max_rows)
+        
+    def _query_markdown(self, sql: str, connection_name: Optional[str],
+                        max_rows: int) -> List[TextContent]:
+        """
+        Execute a SQL query and format the rows as a markdown table.
+        
+        Runs in a worker thread. Rows are formatted one fetched batch at a
+        time, so the full result is never held as rows and as text at once.
+        """
+        with closing(self.odbc.iter_query(sql, connection_name, max_rows)) as batches:
+            description = next(batches)
+            
+            # Format the results as a markdown table
+            if not description:
+                return [_text("Query executed successfully, but no results were returned.")]
                 
+            column_names = [column[0] for column in description]
+            
+            # Create the results table as a header block followed by one
+            # block per fetched batch of rows
+            header = (
+                "### Query Results:\n\n"
+                "| " + " | ".join(column_names) + " |\n"
+                + _separator(len(column_names))
+            )
+            chunks = [_text(header)]
+            
+            # Add the data rows
+            # Skip the NULL check on columns the driver reports as NOT NULL; an
+            # unknown nullability (None) is treated as nullable
+            format_row = _row_formatter(tuple(column[6] is False for column in description))
+            row_count = 0
+            for rows in batches:
+                row_count += len(rows)
+                chunks.append(_text("".join(map(format_row, rows))))
+                
+        # Add the row count
+        footer = f"\n\n_Returned {row_count} rows_"
+        
+        # Check if we hit the row limit
+        if row_count >= max_rows:
+            footer += f" _(limited to {max_rows} rows)_"
+            
+        chunks.append(_text(footer))
+        return chunks
+        
     async def run(self):
         """Run the MCP server."""
         try:
@@ -262,7 +417,7 @@ class ODBCMCPServer:
                     initialization_options,
                 )
         except Exception as e:
-            logger.error(f"Server error: {e}")
+            logger.error("Server error: %s", e)
             raise
         finally:
             # Clean up connections
@@ -0,0 +1,141 @@
+"""
+Tests for loading and validating connection settings.
+"""
+
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from odbc_mcp.config import _build_connection, load_from_claude_config, load_from_ini
+
+
+@pytest.mark.parametrize("value", ["true", "True", "yes", "on", "1", "Y", "t"])
+def test_readonly_true_values(value):
+    assert _build_connection("db", dsn="MyDSN", readonly=value).readonly is True
+
+
+@pytest.mark.parametrize("value", ["false", "no", "off", "0", "N", "f"])
+def test_readonly_false_values(value):
+    assert _build_connection("db", dsn="MyDSN", readonly=value).readonly is False
+
+
+@pytest.mark.parametrize("value", ["ture", "readonly", "2", ""])
+def test_readonly_rejects_unknown_values(value):
+    with pytest.raises(ValidationError):
+        _build_connection("db", dsn="MyDSN", readonly=value)
+
+
+@pytest.mark.parametrize("value", ["ture", "nope"])
+def test_readonly_check_rejects_unknown_values(value):
+    with pytest.raises(ValidationError):
+        _build_connection("db", dsn="MyDSN", readonly_check=value)
+
+
+def test_readonly_defaults_to_true():
+    connection = _build_connection("db", dsn="MyDSN")
+    assert connection.readonly is True
+    assert connection.readonly_check is True
+
+
+@pytest.mark.parametrize("value", ["", "   "])
+def test_empty_strings_become_none(value):
+    connection = _build_connection("db", dsn="MyDSN", username=value, password=value)
+    assert connection.username is None
+    assert connection.password is None
+    assert connection.get_connection_string() == "DSN=MyDSN"
+
+
+@pytest.mark.parametrize("name, settings, expected", [
+    ("sage100", {"dsn": "Accounting"}, True),
+    ("SAGE100", {"dsn": "Accounting"}, True),
+    ("erp", {"driver": "MAS 90 4.0 ODBC Driver (ProvideX)"}, True),
+    ("erp", {"dsn": "SOTAMAS90 ProvideX"}, True),
+    ("erp", {"connection_string": "Driver={ProvideX};Directory=C:\\MAS90"}, True),
+    ("erp", {"dsn": "Accounting"}, False),
+    ("erp", {"driver": "ODBC Driver 18 for SQL Server"}, False),
+])
+def test_providex_detection(name, settings, expected):
+    assert _build_connection(name, **settings).is_providex is expected
+
+
+def test_connection_string_from_parts():
+    connection = _build_connection(
+        "db",
+        driver="ODBC Driver 18 for SQL Server",
+        server="sql01",
+        database="sales",
+        username="reader",
+        password="secret",
+        additional_params={"Encrypt": "yes"},
+    )
+    assert connection.get_connection_string() == (
+        "Driver={ODBC Driver 18 for SQL Server};Server=sql01;Database=sales;"
+        "UID=reader;PWD=secret;Encrypt=yes"
+    )
+
+
+def test_load_from_ini(tmp_path):
+    config_file = tmp_path / "config.ini"
+    config_file.write_text(
+        "[SERVER]\n"
+        "default_connection = main\n"
+        "max_rows = 50\n"
+        "pool_size = 2\n"
+        "\n"
+        "[main]\n"
+        "dsn = MyDSN\n"
+        "username =\n"
+        "readonly = Y\n"
+        "readonly_check = false\n"
+        "Encrypt = 100%\n",
+        encoding="utf-8",
+    )
+
+    config = load_from_ini(str(config_file))
+    connection = config.connections["main"]
+
+    assert config.default_connection == "main"
+    assert config.max_rows == 50
+    assert config.pool_size == 2
+    assert connection.username is None
+    assert connection.readonly is True
+    assert connection.readonly_check is False
+    assert connection.additional_params == {"encrypt": "100%"}
+
+
+def test_load_from_ini_rejects_unknown_readonly(tmp_path):
+    config_file = tmp_path / "config.ini"
+    config_file.write_text("[main]\ndsn = MyDSN\nreadonly = ture\n", encoding="utf-8")
+
+    with pytest.raises(ValidationError):
+        load_from_ini(str(config_file))
+
+
+def _write_claude_config(path, connections):
+    path.write_text(json.dumps({
+        "mcpServerEnv": {
+            "odbc_mcp_server": {
+                "default_connection": "main",
+                "connections": connections,
+            }
+        }
+    }), encoding="utf-8")
+
+
+def test_load_from_claude_config(tmp_path):
+    config_file = tmp_path / "claude_desktop_config.json"
+    _write_claude_config(config_file, {"main": {"dsn": "MyDSN", "readonly": "Y"}})
+
+    config = load_from_claude_config(str(config_file))
+
+    assert config.default_connection == "main"
+    assert config.connections["main"].readonly is True
+
+
+def test_load_from_claude_config_rejects_unknown_readonly(tmp_path):
+    config_file = tmp_path / "claude_desktop_config.json"
+    _write_claude_config(config_file, {"main": {"dsn": "MyDSN", "readonly": "ture"}})
+
+    # Invalid settings are reported and the config is not used
+    assert load_from_claude_config(str(config_file)) is None
@@ -0,0 +1,107 @@
+"""
+Tests for the SQL checks and rewrites applied before queries reach the driver.
+"""
+
+import pytest
+
+# The handler module needs a working pyodbc, which in turn needs an ODBC
+# driver manager; pyodbc fails with an ImportError when that is missing
+try:
+    import pyodbc  # noqa: F401
+except ImportError as e:
+    pytest.skip(f"pyodbc is not usable: {e}", allow_module_level=True)
+
+from odbc_mcp.config import ServerConfig
+from odbc_mcp.odbc import ODBCHandler, _limit_query
+
+
+@pytest.fixture
+def handler():
+    return ODBCHandler(ServerConfig())
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT * FROM t",
+    "  select 1",
+    "WITH x AS (SELECT 1) SELECT * FROM x",
+    "-- note\nSELECT 1",
+    "/* comment */ SELECT 1",
+    "SELECT updated, deleted FROM t",
+    "SELECT * FROM settings",
+])
+def test_read_only_queries(handler, sql):
+    assert handler.is_read_only_query(sql) is True
+
+
+@pytest.mark.parametrize("sql", [
+    "INSERT INTO t VALUES (1)",
+    "insert\ninto t values (1)",
+    "UPDATE t SET a = 1",
+    "DELETE FROM t",
+    "/* comment */ DELETE FROM t",
+    "-- note\nUPDATE t SET a = 1",
+    "/* a */ -- b\n/* c */ DROP TABLE t",
+    "CREATE TABLE t (a INT)",
+    "ALTER TABLE t ADD b INT",
+    "TRUNCATE TABLE t",
+    "GRANT SELECT ON t TO bob",
+    "REVOKE SELECT ON t FROM bob",
+    "  merge into t USING s ON 1 = 1",
+    "EXEC sp_who",
+    "EXECUTE sp_who",
+    "CALL refresh()",
+    "SET NOCOUNT ON",
+    "USE master",
+])
+def test_write_queries(handler, sql):
+    assert handler.is_read_only_query(sql) is False
+
+
+def test_read_only_check_handles_unterminated_comment(handler):
+    # Must not backtrack badly on a long unterminated block comment
+    assert handler.is_read_only_query("/*" + " *" * 50000) is True
+
+
+@pytest.mark.parametrize("sql, dbms_name, expected", [
+    ("SELECT a FROM t", "Microsoft SQL Server", "SELECT TOP 10 a FROM t"),
+    ("select distinct a from t", "Microsoft SQL Server", "select distinct TOP 10 a from t"),
+    ("SELECT a FROM t", "Adaptive Server Enterprise", "SELECT TOP 10 a FROM t"),
+    ("SELECT a FROM t", "PostgreSQL", "SELECT a FROM t\nLIMIT 10"),
+    ("SELECT a FROM t;", "MySQL", "SELECT a FROM t\nLIMIT 10"),
+    ("SELECT a FROM t -- trailing", "SQLite", "SELECT a FROM t -- trailing\nLIMIT 10"),
+])
+def test_limit_pushed_down(sql, dbms_name, expected):
+    assert _limit_query(sql, dbms_name, 10) == expected
+
+
+@pytest.mark.parametrize("sql", [
+    # Already limited
+    "SELECT TOP 5 a FROM t",
+    "SELECT a FROM t LIMIT 5",
+    "SELECT a FROM t ORDER BY a OFFSET 5 ROWS FETCH NEXT 5 ROWS ONLY",
+    # A limit would change the result
+    "SELECT a FROM t UNION SELECT a FROM u",
+    "SELECT a FROM t INTERSECT SELECT a FROM u",
+    "SELECT a FROM t EXCEPT SELECT a FROM u",
+    # Writes rows instead of returning them
+    "SELECT * INTO newt FROM big",
+    # Locking clauses must follow LIMIT
+    "SELECT a FROM t FOR UPDATE",
+    "SELECT a FROM t FOR SHARE",
+    "SELECT a FROM t LOCK IN SHARE MODE",
+    # More than one statement
+    "SELECT 1 FROM t; DELETE FROM audit WHERE old = 1",
+    "SELECT 1; SELECT 2;",
+    # Not a SELECT
+    "WITH x AS (SELECT 1) SELECT * FROM x",
+    "DELETE FROM t",
+    "-- note\nSELECT a FROM t",
+])
+@pytest.mark.parametrize("dbms_name", ["Microsoft SQL Server", "MySQL", "PostgreSQL"])
+def test_limit_not_pushed_down(sql, dbms_name):
+    assert _limit_query(sql, dbms_name, 10) == sql
+
+
+@pytest.mark.parametrize("dbms_name", ["Oracle", "ProvideX", ""])
+def test_limit_not_pushed_down_for_unknown_dbms(dbms_name):
+    assert _limit_query("SELECT a FROM t", dbms_name, 10) == "SELECT a FROM t"